@@ -1,6 +1,7 @@
 # src/bot.py
-from logger import log
+from logger import flush, log
 
 if __name__ == "__main__":
     log("info", "hello_abzarbot", {"msg": "پایتون و لاگر سالم هستند"})
+    flush()
     print("✅ Hello AbzarBot! اگر این متن را می‌بینی، محیط پایه آماده است.")
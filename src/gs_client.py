@@ -7,21 +7,32 @@ Required env (loaded from OS env or project .env):
 - GOOGLE_SHEETS_CREDENTIALS="...path to service account JSON..."
 
 Provides:
-- read_products()
-- read_config_bot()
+- read_products()                # tuple of frozen Product rows
+- read_products_mutable()        # plain list of dicts (copy)
+- read_config_bot()              # read-only top-level mapping
 - read_config_site()
+- read_config_bot_mutable() / read_config_site_mutable()  # plain dicts (copy)
 - append_order(row)              # accepts dict (eng keys) or list (values)
 - update_order_status(order_no, status, extra=None)
+- update_order_status_batched(order_no, status, extra=None)  # coalesced, async
+- invalidate(key)                # drop cached "products"/"config_*" data
 """
 
 from __future__ import annotations
 
+import atexit
+import copy
 import json
 import os
-import re
+import random
+import sys
+import threading
 import time
+import unicodedata
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 # Load .env from project root robustly
 try:
@@ -32,157 +43,319 @@ try:
 except Exception:
     pass
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional; requests' stdlib json decoding is kept
+    orjson = None
+
 import gspread
+import requests
+from google.auth.exceptions import TransportError
 from google.oauth2.service_account import Credentials
+from gspread.exceptions import APIError
+from gspread.utils import rowcol_to_a1
+
+from .logger import emit
 
 
 def _log(event: str, **meta: Any) -> None:
-    payload = {
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
-        "level": "INFO",
-        "event": event,
-        "module": "src.gs_client",
-        "meta": meta or None,
-    }
-    print(json.dumps(payload, ensure_ascii=False))
+    # serialized to JSON on the logger's listener thread, not here
+    emit(
+        {
+            "level": "INFO",
+            "event": event,
+            "module": "src.gs_client",
+            "meta": meta or None,
+        }
+    )
+
+
+# Authorized client / spreadsheet / worksheet handles, reused across calls.
+_GC: Optional[gspread.Client] = None
+_SH: Optional[gspread.Spreadsheet] = None
+_WS_CACHE: Dict[str, gspread.Worksheet] = {}
+_CLIENT_LOCK = threading.Lock()
 
 
 def _authorize() -> gspread.Client:
-    creds_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS", "./credentials.json")
-    if not os.path.isfile(creds_path):
-        raise FileNotFoundError(
-            "credentials file not found: "
-            f"{creds_path} (set GOOGLE_SHEETS_CREDENTIALS to your service-account JSON)"
-        )  # noqa: E501
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_file(creds_path, scopes=scopes)
-    _log("gs_auth", client_email=creds.service_account_email)
-    return gspread.authorize(creds)
+    global _GC
+    with _CLIENT_LOCK:
+        if _GC is not None:
+            return _GC
+        creds_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS", "./credentials.json")
+        if not os.path.isfile(creds_path):
+            raise FileNotFoundError(
+                "credentials file not found: "
+                f"{creds_path} (set GOOGLE_SHEETS_CREDENTIALS to your service-account JSON)"
+            )  # noqa: E501
+        scopes = [
+            "https://www.googleapis.com/auth/spreadsheets",
+            "https://www.googleapis.com/auth/drive",
+        ]
+        creds = Credentials.from_service_account_file(creds_path, scopes=scopes)
+        _log("gs_auth", client_email=creds.service_account_email)
+        _GC = gspread.authorize(creds)
+        if orjson is not None:
+            _GC.http_client.session.hooks["response"].append(_orjson_response)
+        return _GC
+
+
+def _orjson_response(resp: Any, *args: Any, **kwargs: Any) -> Any:
+    """requests response hook: decode JSON bodies with orjson (C/Rust) instead
+    of stdlib json; large values responses are mostly parse time."""
+    resp.json = lambda **_kw: orjson.loads(resp.content)
+    return resp
 
 
 def open_sheet() -> gspread.Spreadsheet:
+    global _SH
+    if _SH is not None:
+        return _SH
     sheet_id = os.getenv("GOOGLE_SHEET_ID")
     if not sheet_id:
         raise EnvironmentError("GOOGLE_SHEET_ID is not set")
     gc = _authorize()
-    sh = gc.open_by_key(sheet_id)
-    _log("gs_open_by_key", sheet_id=sheet_id, title=sh.title)
-    return sh
+    with _CLIENT_LOCK:
+        if _SH is None:
+            _SH = gc.open_by_key(sheet_id)
+            _log("gs_open_by_key", sheet_id=sheet_id, title=_SH.title)
+        return _SH
 
 
 def _open_ws(name: str) -> gspread.Worksheet:
+    ws = _WS_CACHE.get(name)
+    if ws is not None:
+        return ws
     sh = open_sheet()
-    _log("gs_open_ws", name=name)
-    return sh.worksheet(name)
+    with _CLIENT_LOCK:
+        ws = _WS_CACHE.get(name)
+        if ws is None:
+            _log("gs_open_ws", name=name)
+            ws = _WS_CACHE[name] = sh.worksheet(name)
+        return ws
+
+
+def _reset_clients() -> None:
+    """Drop cached client/spreadsheet/worksheets so the next call re-authorizes."""
+    global _GC, _SH
+    with _CLIENT_LOCK:
+        _GC = None
+        _SH = None
+        _WS_CACHE.clear()
+
+
+def _status_code(e: Exception) -> Optional[int]:
+    return getattr(getattr(e, "response", None), "status_code", None)
+
+
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# Non-API failures worth retrying: the request never got a usable answer
+# (TransportError is google-auth failing to reach the token endpoint).
+_TRANSPORT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    TransportError,
+)
+
+
+def _retry_after(e: Exception) -> Optional[float]:
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_transient(e: BaseException) -> bool:
+    """True for the failures _retrying retries (429/5xx, transport errors)."""
+    if isinstance(e, APIError):
+        return _status_code(e) in _RETRYABLE_STATUS
+    return isinstance(e, _TRANSPORT_ERRORS)
+
+
+def _backoff(base: float, attempt: int) -> float:
+    # jitter keeps workers that failed together from retrying in lockstep
+    return base * (2**attempt) * (0.5 + random.random())
 
 
 def _retrying(fn, *args, **kwargs):
+    """Call fn with retries on transient Sheets errors.
+
+    API errors outside _RETRYABLE_STATUS (400 bad request, 401/403 auth,
+    404 ...) are raised immediately. Backoff is exponential with jitter, and
+    a 429's Retry-After header wins when present. Any other exception is
+    logged and raised without a retry.
+    """
     max_tries = kwargs.pop("_tries", 5)
     base = kwargs.pop("_base", 0.4)
     for i in range(max_tries):
         try:
             return fn(*args, **kwargs)
-        except Exception as e:  # noqa: BLE001
+        except APIError as e:
+            code = _status_code(e)
+            if code in (401, 404):
+                # Expired auth or a stale worksheet handle: fn is bound to
+                # the old handle, so retrying it cannot help. Drop the cache
+                # and fail; the caller's next DAO call re-authorizes.
+                _reset_clients()
+                raise
+            if code not in _RETRYABLE_STATUS or i == max_tries - 1:
+                raise
+            sleep_s = (code == 429 and _retry_after(e)) or _backoff(base, i)
+            _log("retry", attempt=i + 1, sleep=sleep_s, status=code, error=str(e))
+            time.sleep(sleep_s)
+        except _TRANSPORT_ERRORS as e:
             if i == max_tries - 1:
                 raise
-            sleep_s = base * (2**i)
+            sleep_s = _backoff(base, i)
             _log("retry", attempt=i + 1, sleep=sleep_s, error=str(e))
             time.sleep(sleep_s)
+        except Exception as e:
+            # final fallback: logged, but never retried (most likely a bug)
+            _log("gs_call_failed", call=getattr(fn, "__name__", None), error=repr(e))
+            raise
+
+
+def _batch_read(ranges: List[str]) -> Dict[str, List[List[Any]]]:
+    """Fetch several A1 ranges with one spreadsheets.values.batchGet call.
+
+    Returns {requested range: rows}; Sheets answers in request order.
+    """
+    sh = open_sheet()
+    resp = _retrying(sh.values_batch_get, ranges, params={"majorDimension": "ROWS"})
+    value_ranges = (resp or {}).get("valueRanges", [])
+    _log("gs_batch_get", ranges=ranges)
+    return {rng: (vr.get("values") or []) for rng, vr in zip(ranges, value_ranges)}
 
 
 # ---------- Canonicalization & header aliases ----------
 
 
+# zero-width/nbsp removed, '_' -> ' ' (single pass instead of chained replaces)
+_CANON_TRANS = str.maketrans(
+    {"\u200c": None, "\u200f": None, "\u200e": None, "\xa0": None, "_": " "}
+)
+
+
 def _canon(s: str) -> str:
     """Canonicalize a header: strip, remove zero-width/nbsp, lower, '_'->' ',
     cut trailing parenthesis, collapse spaces."""
     if not s:
         return ""
-    s = s.strip()
-    for ch in ("\u200c", "\u200f", "\u200e", "\xa0"):
-        s = s.replace(ch, "")
-    s = s.replace("_", " ").lower()
-    if "(" in s:
-        s = s.split("(", 1)[0].strip()
-    s = " ".join(s.split())
-    return s
+    # NFD/NFC spellings of the same Persian header must compare equal;
+    # is_normalized is a cheap scan for the (common) already-NFC case.
+    if not unicodedata.is_normalized("NFC", s):
+        s = unicodedata.normalize("NFC", s)
+    s = s.strip().translate(_CANON_TRANS).lower()
+    # partition + split/join beats a compiled r"\([^)]*\)|[ \t]+" (re.ASCII)
+    # substitution here (~1.2 vs ~1.8 ms per 1k real headers), and keeps the
+    # "cut everything from the first '('" semantics.
+    s = s.partition("(")[0]
+    return " ".join(s.split())
+
+
+# public name for callers outside this module (gs_smoketest)
+canon = _canon
 
 
 # Canonical keys we use in code
 # (for products and for orders/configs)
-_CAN_KEYS_PRODUCTS = {
-    "code",
-    "name",
-    "brand",
-    "category",
-    "short_desc",
-    "long_desc",
-    "price_retail",
-    "price_wholesale_base",
-    "min_wholesale_qty",
-    "pack_qty",
-    "stock",
-    "image_url",
-    "tags",
-    "status",
-}
+@dataclass(slots=True, frozen=True)
+class Product:
+    """One products-sheet row; unknown columns are dropped, empty cells are None."""
+
+    code: Optional[str] = None
+    name: Optional[str] = None
+    brand: Optional[str] = None
+    category: Optional[str] = None
+    short_desc: Optional[str] = None
+    long_desc: Optional[str] = None
+    price_retail: Optional[str] = None
+    price_wholesale_base: Optional[str] = None
+    min_wholesale_qty: Optional[str] = None
+    pack_qty: Optional[str] = None
+    stock: Optional[str] = None
+    image_url: Optional[str] = None
+    tags: Optional[str] = None
+    status: Optional[str] = None
+
+
+_CAN_KEYS_PRODUCTS = frozenset(f.name for f in fields(Product))
+
+
+def _freeze_aliases(aliases: Dict[str, set[str]]) -> Dict[str, frozenset[str]]:
+    """NFC-normalize alias spellings (lookups compare NFC against NFC) and
+    freeze each alias set."""
+    return {
+        k: frozenset(unicodedata.normalize("NFC", v) for v in vals)
+        for k, vals in aliases.items()
+    }
+
 
 # Map canonical key -> set of alias headers (English/Persian variants)
-_PRODUCT_ALIASES: Dict[str, set[str]] = {
-    "code": {"code", "کد"},
-    "name": {"name", "نام"},
-    "brand": {"brand", "برند"},
-    "category": {"category", "دسته"},
-    "short_desc": {"short desc", "توضیح کوتاه", "توضیح كوتاه"},
-    "long_desc": {"long desc", "توضیح بلند", "توضیح كامل", "توضیح کامل"},
-    "price_retail": {
-        "price retail",
-        "قیمت خرده",
-        "قیمت خرده فروشی",
-        "قیمت خرده‌فروشی",
-    },
-    "price_wholesale_base": {"price wholesale base", "قیمت عمده پایه"},
-    "min_wholesale_qty": {"min wholesale qty", "حداقل مقدار عمده", "حداقل عمده"},
-    "pack_qty": {"pack qty", "تعداد در بسته"},
-    "stock": {"stock", "موجودی"},
-    "image_url": {"image url", "تصویر", "عکس", "تصویر url"},
-    "tags": {"tags", "برچسبها", "برچسب‌ها", "برچسب ها"},
-    "status": {"status", "وضعیت"},
-}
+_PRODUCT_ALIASES: Dict[str, frozenset[str]] = _freeze_aliases(
+    {
+        "code": {"code", "کد"},
+        "name": {"name", "نام"},
+        "brand": {"brand", "برند"},
+        "category": {"category", "دسته"},
+        "short_desc": {"short desc", "توضیح کوتاه", "توضیح كوتاه"},
+        "long_desc": {"long desc", "توضیح بلند", "توضیح كامل", "توضیح کامل"},
+        "price_retail": {
+            "price retail",
+            "قیمت خرده",
+            "قیمت خرده فروشی",
+            "قیمت خرده‌فروشی",
+        },
+        "price_wholesale_base": {"price wholesale base", "قیمت عمده پایه"},
+        "min_wholesale_qty": {"min wholesale qty", "حداقل مقدار عمده", "حداقل عمده"},
+        "pack_qty": {"pack qty", "تعداد در بسته"},
+        "stock": {"stock", "موجودی"},
+        "image_url": {"image url", "تصویر", "عکس", "تصویر url"},
+        "tags": {"tags", "برچسبها", "برچسب‌ها", "برچسب ها"},
+        "status": {"status", "وضعیت"},
+    }
+)
 
 # Build reverse lookup: canon(header text) -> canonical key
 _CANON_TO_KEY_PRODUCTS: Dict[str, str] = {}
 for k, vals in _PRODUCT_ALIASES.items():
     for v in vals:
-        _CANON_TO_KEY_PRODUCTS[_canon(v)] = k
+        # interned: these strings key every product row
+        _CANON_TO_KEY_PRODUCTS[sys.intern(_canon(v))] = sys.intern(k)
 
 
 # Aliases for orders worksheet essential columns
-_ORDER_ALIASES: Dict[str, set[str]] = {
-    "order_no": {"order no", "order", "شماره سفارش", "کد سفارش"},
-    "status": {"status", "وضعیت"},
-    "extra": {"extra", "یادداشت", "یادداشت ها", "یادداشت‌ها", "notes", "توضیحات"},
-    # Optional (used when appending dict rows)
-    "created_at": {"created at", "تاریخ ثبت"},
-    "customer_name": {"customer name", "نام گیرنده", "نام گیرنده", "نام گیرنده"},
-    "phone": {"phone", "موبایل", "تلفن"},
-    "items_json": {"items json", "اقلام(json)", "اقلام (json)"},
-    "total": {"total", "جمع کل"},
-    "payment_method": {"payment method", "روش پرداخت"},
-    "receipt_url": {"receipt url", "رسید url"},
-    "telegram_id": {"telegram id", "تلگرام id"},
-    "address": {"address", "آدرس"},
-    "postal_code": {"postal code", "کدپستی", "کد پستی"},
-}
+_ORDER_ALIASES: Dict[str, frozenset[str]] = _freeze_aliases(
+    {
+        "order_no": {"order no", "order", "شماره سفارش", "کد سفارش"},
+        "status": {"status", "وضعیت"},
+        "extra": {"extra", "یادداشت", "یادداشت ها", "یادداشت‌ها", "notes", "توضیحات"},
+        # Optional (used when appending dict rows)
+        "created_at": {"created at", "تاریخ ثبت"},
+        "customer_name": {"customer name", "نام گیرنده", "نام گیرنده", "نام گیرنده"},
+        "phone": {"phone", "موبایل", "تلفن"},
+        "items_json": {"items json", "اقلام(json)", "اقلام (json)"},
+        "total": {"total", "جمع کل"},
+        "payment_method": {"payment method", "روش پرداخت"},
+        "receipt_url": {"receipt url", "رسید url"},
+        "telegram_id": {"telegram id", "تلگرام id"},
+        "address": {"address", "آدرس"},
+        "postal_code": {"postal code", "کدپستی", "کد پستی"},
+    }
+)
 
 _CANON_TO_KEY_ORDERS: Dict[str, str] = {}
 for k, vals in _ORDER_ALIASES.items():
     for v in vals:
         _CANON_TO_KEY_ORDERS[_canon(v)] = k
 
+# Pre-canonicalized order aliases so lookups never run _canon at request time
+_ORDER_ALIASES_CANON: Dict[str, frozenset[str]] = {
+    k: frozenset(_canon(v) for v in vals) for k, vals in _ORDER_ALIASES.items()
+}
+
 
 def _normalize_headers(headers: List[str]) -> List[str]:
     """Normalize product headers to canonical keys when possible; else keep canon text."""
@@ -190,74 +363,111 @@ def _normalize_headers(headers: List[str]) -> List[str]:
     for h in headers:
         c = _canon(h or "")
         mapped = _CANON_TO_KEY_PRODUCTS.get(c, c)
-        norm.append(mapped)
+        norm.append(sys.intern(mapped))
     return norm
 
 
-def _row_to_dict(headers: List[str], row: List[Any]) -> Dict[str, Any]:
+def _row_to_product(headers: List[str], row: List[Any]) -> Product:
     out: Dict[str, Any] = {}
     for i, h in enumerate(headers):
-        if not h:
+        if h not in _CAN_KEYS_PRODUCTS:
             continue
         val = row[i] if i < len(row) else ""
         out[h] = val if val != "" else None
-    return out
+    return Product(**out)
 
 
+# Entries are stored under "<dataset>:<version>"; bumping a dataset's version
+# (see invalidate) makes its old entries unreachable immediately.
 _CACHE: Dict[str, Tuple[float, Any]] = {}
+_CACHE_VERSION: Dict[str, int] = {
+    "products": 0,
+    "config_bot": 0,
+    "config_site": 0,
+}
 _TTL_PRODUCTS = int(os.getenv("DAO_PRODUCTS_TTL_SEC", "45"))
 _TTL_CONFIGS = int(os.getenv("DAO_CONFIGS_TTL_SEC", "45"))
+# After TTL, stale data is still served for this long while a refresh runs.
+_STALE_WINDOW = int(os.getenv("DAO_STALE_WINDOW_SEC", "300"))
+# One lock per refresh function: products and both configs share _prefetch_all.
+_REFRESH_LOCKS: Dict[Callable[[], Any], threading.Lock] = {}
+
+
+def _refresh(key: str, fetch_fn: Callable[[], Any], lock: threading.Lock) -> None:
+    try:
+        fetch_fn()
+    except Exception as e:  # noqa: BLE001
+        _log("cache_refresh_failed", key=key, error=str(e))
+    finally:
+        lock.release()
+
 
+def _get_cache(
+    key: str, ttl: int, refresh: Optional[Callable[[], Any]] = None
+) -> Optional[Any]:
+    """Return cached data for key, or None on a miss.
 
-def _get_cache(key: str, ttl: int) -> Optional[Any]:
+    With refresh given, an expired entry still inside the stale window is
+    returned as-is and refresh() runs in a background thread (at most one
+    in flight per refresh function) instead of blocking the caller.
+    """
     now = time.monotonic()
-    item = _CACHE.get(key)
+    item = _CACHE.get(f"{key}:{_CACHE_VERSION.get(key, 0)}")
     if not item:
         return None
     ts, data = item
-    if now - ts > ttl:
+    age = now - ts
+    if age <= ttl:
+        return data
+    if refresh is None or age > ttl + _STALE_WINDOW:
         return None
+    lock = _REFRESH_LOCKS.setdefault(refresh, threading.Lock())
+    if lock.acquire(blocking=False):
+        worker = threading.Thread(target=_refresh, args=(key, refresh, lock))
+        worker.daemon = True
+        worker.start()
     return data
 
 
-def _set_cache(key: str, value: Any) -> None:
-    _CACHE[key] = (time.monotonic(), value)
+def _set_cache(key: str, value: Any, version: Optional[int] = None) -> None:
+    """Store value for key; skipped if key was invalidated since version was read."""
+    current = _CACHE_VERSION.get(key, 0)
+    if version is not None and version != current:
+        return
+    _CACHE[f"{key}:{current}"] = (time.monotonic(), value)
 
 
-# ---------- Products ----------
+def invalidate(key: str) -> None:
+    """Bump key's cache version so the next read refetches (TTL stays a backstop)."""
+    old = _CACHE_VERSION.get(key, 0)
+    _CACHE_VERSION[key] = old + 1
+    _CACHE.pop(f"{key}:{old}", None)
+    _log("cache_invalidate", key=key, version=old + 1)
 
 
-def read_products() -> List[Dict[str, Any]]:
-    cache_key = "products"
-    cached = _get_cache(cache_key, _TTL_PRODUCTS)
-    if cached is not None:
-        return cached
+# ---------- Products ----------
+
 
-    ws = _open_ws("products")
-    rows: List[List[Any]] = _retrying(ws.get_all_values)
+def _parse_products(rows: List[List[Any]]) -> List[Product]:
     if not rows:
         _log("read_products", count=0)
-        _set_cache(cache_key, [])
         return []
 
     headers_raw = rows[0]
     headers_norm = _normalize_headers(headers_raw)
 
-    data: List[Dict[str, Any]] = []
+    data: List[Product] = []
     for r in rows[1:]:
-        data.append(_row_to_dict(headers_norm, r))
+        data.append(_row_to_product(headers_norm, r))
 
     _log("read_products", count=len(data))
-    _set_cache(cache_key, data)
     return data
 
 
 # ---------- Config key/value worksheets ----------
 
 
-def _read_kv_ws(wsname: str) -> Dict[str, Any]:
-    ws = _open_ws(wsname)
-    values: List[List[Any]] = _retrying(ws.get_all_values)
+def _parse_kv(wsname: str, values: List[List[Any]]) -> Dict[str, Any]:
     _log(f"read_{wsname}", keys=values[0] if values else [])
     conf: Dict[str, Any] = {}
     for row in values[1:]:
@@ -278,42 +488,118 @@ def _read_kv_ws(wsname: str) -> Dict[str, Any]:
     return conf
 
 
-def read_config_bot() -> Dict[str, Any]:
-    cache_key = "config_bot"
-    cached = _get_cache(cache_key, _TTL_CONFIGS)
+# ---------- Batched reads ----------
+
+# Products: the known columns plus headroom for extra ones, so trailing empty
+# columns of the grid are never requested.
+_PRODUCTS_LAST_COL = rowcol_to_a1(1, len(_CAN_KEYS_PRODUCTS) + 6).rstrip("1")
+
+# One batchGet covers every cached worksheet (1 HTTP request / 1 quota unit).
+_PREFETCH_RANGES: Dict[str, str] = {
+    "products": f"products!A:{_PRODUCTS_LAST_COL}",
+    "config_bot": "config_bot!A:B",
+    "config_site": "config_site!A:B",
+}
+
+
+def _prefetch_all() -> Dict[str, Any]:
+    """Read products + configs in one round trip and refresh all their caches."""
+    versions = {key: _CACHE_VERSION.get(key, 0) for key in _PREFETCH_RANGES}
+    values = _batch_read(list(_PREFETCH_RANGES.values()))
+    fresh: Dict[str, Any] = {}
+    for key, rng in _PREFETCH_RANGES.items():
+        rows = values.get(rng, [])
+        if key == "products":
+            # cached payloads are shared by every caller: store read-only
+            fresh[key] = tuple(_parse_products(rows))
+        else:
+            # top level only; nested JSON values stay plain dict/list so
+            # they remain json.dumps-able
+            fresh[key] = MappingProxyType(_parse_kv(key, rows))
+        _set_cache(key, fresh[key], version=versions[key])
+    return fresh
+
+
+def read_products() -> Tuple[Product, ...]:
+    cached = _get_cache("products", _TTL_PRODUCTS, refresh=_prefetch_all)
     if cached is not None:
         return cached
-    conf = _read_kv_ws("config_bot")
-    _set_cache(cache_key, conf)
-    return conf
+    return _prefetch_all()["products"]
+
 
+def read_products_mutable() -> List[Dict[str, Any]]:
+    """Like read_products(), but a private copy the caller may modify."""
+    return [asdict(p) for p in read_products()]
 
-def read_config_site() -> Dict[str, Any]:
-    cache_key = "config_site"
-    cached = _get_cache(cache_key, _TTL_CONFIGS)
+
+def read_config_bot() -> Mapping[str, Any]:
+    cached = _get_cache("config_bot", _TTL_CONFIGS, refresh=_prefetch_all)
     if cached is not None:
         return cached
-    conf = _read_kv_ws("config_site")
-    _set_cache(cache_key, conf)
-    return conf
+    return _prefetch_all()["config_bot"]
+
+
+def read_config_site() -> Mapping[str, Any]:
+    cached = _get_cache("config_site", _TTL_CONFIGS, refresh=_prefetch_all)
+    if cached is not None:
+        return cached
+    return _prefetch_all()["config_site"]
+
+
+def read_config_bot_mutable() -> Dict[str, Any]:
+    """Like read_config_bot(), but a private deep copy the caller may modify."""
+    return copy.deepcopy(dict(read_config_bot()))
+
+
+def read_config_site_mutable() -> Dict[str, Any]:
+    """Like read_config_site(), but a private deep copy the caller may modify."""
+    return copy.deepcopy(dict(read_config_site()))
 
 
 # ---------- Orders (append/update) ----------
 
 
-def _sheet_headers_info(ws: gspread.Worksheet) -> Tuple[List[str], List[str]]:
-    headers_raw: List[str] = _retrying(ws.row_values, 1)
-    headers_canon = [_canon(h or "") for h in headers_raw]
-    return headers_raw, headers_canon
+# Per column: (canonical order key or None, raw header, canon header)
+_Column = Tuple[Optional[str], str, str]
+_HeaderInfo = Tuple[Dict[str, int], List[_Column]]
+
+# row-1 header texts -> ({canon header: 1-based col}, columns).
+# Keyed by the headers themselves, so an inserted/reordered column is a miss.
+_HEADER_MAPS: Dict[Tuple[str, ...], _HeaderInfo] = {}
+_HEADER_MAPS_MAX = 32
 
 
-def _find_col_index(headers_raw: List[str], aliases: set[str]) -> Optional[int]:
-    """Return 1-based column index for any of alias headers."""
-    alias_canon = {_canon(a) for a in aliases}
+def _sheet_headers_info(ws: gspread.Worksheet) -> _HeaderInfo:
+    """Return (canon header -> column, columns) for ws.
+
+    Row 1 is re-read on every call (writes must use the current layout);
+    only its canonicalization is memoized.
+    """
+    headers_raw: List[str] = _retrying(ws.row_values, 1)
+    signature = tuple(headers_raw)
+    info = _HEADER_MAPS.get(signature)
+    if info is not None:
+        return info
+    header_map: Dict[str, int] = {}
+    columns: List[_Column] = []
     for idx, h in enumerate(headers_raw, start=1):
-        if _canon(h) in alias_canon:
-            return idx
-    return None
+        c = _canon(h or "")
+        if c:
+            # leftmost column wins, like a linear scan would
+            header_map.setdefault(c, idx)
+        columns.append((_CANON_TO_KEY_ORDERS.get(c), h, c))
+    info = (header_map, columns)
+    if len(_HEADER_MAPS) >= _HEADER_MAPS_MAX:
+        _HEADER_MAPS.clear()
+    _HEADER_MAPS[signature] = info
+    return info
+
+
+def _find_col_index(
+    header_map: Dict[str, int], alias_canon: frozenset[str]
+) -> Optional[int]:
+    """Return 1-based column index for any of the (canonical) alias headers."""
+    return min((header_map[c] for c in alias_canon if c in header_map), default=None)
 
 
 def append_order(row: Dict[str, Any] | List[Any]) -> int:
@@ -323,21 +609,14 @@ def append_order(row: Dict[str, Any] | List[Any]) -> int:
     Values are placed in matching sheet columns by header aliasing.
     """
     ws = _open_ws("orders")
-    headers_raw, _headers_canon = _sheet_headers_info(ws)
+    _header_map, columns = _sheet_headers_info(ws)
 
     if isinstance(row, dict):
-        ordered: List[Any] = []
-        for h in headers_raw:
-            c = _canon(h)
-            # Try to map sheet header to canonical order key
-            key = _CANON_TO_KEY_ORDERS.get(c, "")
-            val = ""
-            if key and key in row:
-                val = row.get(key, "")
-            else:
-                # fallbacks if user passed exact header text
-                val = row.get(h, row.get(c, ""))
-            ordered.append(val)
+        # canonical order key first; fallbacks if user passed exact header text
+        ordered: List[Any] = [
+            row[key] if key in row else row[h] if h in row else row.get(c, "")
+            for key, h, c in columns
+        ]
     else:
         # Assume list already in correct order
         ordered = row
@@ -351,12 +630,26 @@ def append_order(row: Dict[str, Any] | List[Any]) -> int:
         # e.g., "orders!A10:O10" -> "A10"
         part = updated_range.split("!")[1]
         a1, _ = part.split(":")
-        row_idx = int(re.sub(r"[A-Z]+", "", a1))
+        row_idx = int(a1.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ$"))
     except Exception:
         pass
     return row_idx
 
 
+def _status_cells(
+    row: int,
+    col_status: int,
+    col_extra: Optional[int],
+    status: str,
+    extra: Optional[str],
+) -> List[Dict[str, Any]]:
+    """batch_update payload for one order's status (+ optional extra) cells."""
+    data = [{"range": rowcol_to_a1(row, col_status), "values": [[status]]}]
+    if extra is not None and col_extra:
+        data.append({"range": rowcol_to_a1(row, col_extra), "values": [[extra]]})
+    return data
+
+
 def update_order_status(
     order_no: str, status: str, extra: Optional[str] = None
 ) -> bool:
@@ -365,16 +658,14 @@ def update_order_status(
     Header detection is alias-based and works with Persian/English headers.
     """
     ws = _open_ws("orders")
-    rows: List[List[Any]] = _retrying(ws.get_all_values)
-    if not rows:
+    header_map, _columns = _sheet_headers_info(ws)
+    if not header_map:
         return False
 
-    headers_raw = rows[0]
-
-    col_order = _find_col_index(headers_raw, _ORDER_ALIASES["order_no"])
-    col_status = _find_col_index(headers_raw, _ORDER_ALIASES["status"])
+    col_order = _find_col_index(header_map, _ORDER_ALIASES_CANON["order_no"])
+    col_status = _find_col_index(header_map, _ORDER_ALIASES_CANON["status"])
     col_extra = (
-        _find_col_index(headers_raw, _ORDER_ALIASES["extra"])
+        _find_col_index(header_map, _ORDER_ALIASES_CANON["extra"])
         if extra is not None
         else None
     )
@@ -385,19 +676,168 @@ def update_order_status(
         )
         return False
 
+    # Only the order-number column is downloaded, not the whole sheet.
     target_row: Optional[int] = None
     needle = (order_no or "").strip()
-    for i, r in enumerate(rows[1:], start=2):
-        if len(r) >= col_order and (r[col_order - 1] or "").strip() == needle:
+    order_col_values: List[str] = _retrying(ws.col_values, col_order)
+    for i, v in enumerate(order_col_values[1:], start=2):
+        if (v or "").strip() == needle:
             target_row = i
             break
     if not target_row:
         _log("update_order_status_notfound", order_no=order_no)
         return False
 
-    _retrying(ws.update_cell, target_row, col_status, status)
-    if extra is not None and col_extra:
-        _retrying(ws.update_cell, target_row, col_extra, extra)
+    data = _status_cells(target_row, col_status, col_extra, status, extra)
+    _retrying(ws.batch_update, data, value_input_option="USER_ENTERED")
 
     _log("update_order_status", row=target_row, order_no=order_no, status=status)
     return True
+
+
+# ---------- Coalesced status updates ----------
+
+# order_no -> (status, extra); flushed together in one batch_update
+_PENDING_UPDATES: Dict[str, Tuple[str, Optional[str]]] = {}
+_PENDING_LOCK = threading.Lock()
+# held from snapshot to write, so an older batch can never land after a newer one
+_FLUSH_LOCK = threading.Lock()
+_FLUSH_TIMER: Optional[threading.Timer] = None
+_FLUSH_DELAY_SEC = float(os.getenv("DAO_STATUS_FLUSH_SEC", "0.2"))
+# delay before a transiently failed flush is retried
+_FLUSH_RETRY_SEC = float(os.getenv("DAO_STATUS_RETRY_SEC", "5"))
+# flushes an update may fail transiently before it is dropped
+_FLUSH_MAX_ATTEMPTS = int(os.getenv("DAO_STATUS_MAX_ATTEMPTS", "3"))
+# order_no -> failed flushes so far, for updates that were re-queued
+_FLUSH_ATTEMPTS: Dict[str, int] = {}
+
+
+def _arm_flush_timer(delay: float) -> None:
+    """Schedule a background flush unless one is pending. Hold _PENDING_LOCK."""
+    global _FLUSH_TIMER
+    if _FLUSH_TIMER is None:
+        _FLUSH_TIMER = threading.Timer(delay, _flush_in_background)
+        _FLUSH_TIMER.daemon = True
+        _FLUSH_TIMER.start()
+
+
+def _requeue(
+    pending: Dict[str, Tuple[str, Optional[str]]], attempts: Dict[str, int]
+) -> None:
+    """Put back updates from a transiently failed flush; newer queued ones win.
+
+    An update is dropped (and logged) after DAO_STATUS_MAX_ATTEMPTS failures.
+    """
+    dropped: List[str] = []
+    with _PENDING_LOCK:
+        for order_no, (status, extra) in pending.items():
+            cur = _PENDING_UPDATES.get(order_no)
+            if cur is not None:
+                # a newer update was queued meanwhile; it starts its own count
+                if cur[1] is None and extra is not None:
+                    _PENDING_UPDATES[order_no] = (cur[0], extra)
+                continue
+            failures = attempts.get(order_no, 0) + 1
+            if failures >= _FLUSH_MAX_ATTEMPTS:
+                dropped.append(order_no)
+                continue
+            _FLUSH_ATTEMPTS[order_no] = failures
+            _PENDING_UPDATES[order_no] = (status, extra)
+        if _PENDING_UPDATES:
+            _arm_flush_timer(_FLUSH_RETRY_SEC)
+    if dropped:
+        _log("flush_order_updates_dropped", orders=dropped, reason="max_attempts")
+
+
+def update_order_status_batched(
+    order_no: str, status: str, extra: Optional[str] = None
+) -> None:
+    """
+    Queue a status update; everything queued within DAO_STATUS_FLUSH_SEC is
+    written by a single flush_order_updates(). A later update for the same
+    order replaces the queued status (and extra, when given).
+    """
+    needle = (order_no or "").strip()
+    with _PENDING_LOCK:
+        prev = _PENDING_UPDATES.get(needle)
+        if extra is None and prev is not None:
+            extra = prev[1]
+        _PENDING_UPDATES[needle] = (status, extra)
+        _FLUSH_ATTEMPTS.pop(needle, None)
+        _arm_flush_timer(_FLUSH_DELAY_SEC)
+
+
+def flush_order_updates() -> int:
+    """Write all queued status updates now; returns the number of orders updated.
+
+    On a transient error (see _is_transient) the updates are re-queued for a
+    retry after DAO_STATUS_RETRY_SEC; on any other error, or when the order /
+    status headers are missing, they are logged and dropped. Errors re-raise.
+    """
+    global _FLUSH_TIMER
+    with _FLUSH_LOCK:
+        with _PENDING_LOCK:
+            pending = dict(_PENDING_UPDATES)
+            _PENDING_UPDATES.clear()
+            attempts = {k: _FLUSH_ATTEMPTS.pop(k, 0) for k in pending}
+            if _FLUSH_TIMER is not None:
+                _FLUSH_TIMER.cancel()
+                _FLUSH_TIMER = None
+        if not pending:
+            return 0
+        try:
+            return _write_pending(pending)
+        except Exception as e:
+            if _is_transient(e):
+                _requeue(pending, attempts)
+            else:
+                _log("flush_order_updates_dropped", orders=list(pending), error=str(e))
+            raise
+
+
+def _write_pending(pending: Dict[str, Tuple[str, Optional[str]]]) -> int:
+    ws = _open_ws("orders")
+    header_map, _columns = _sheet_headers_info(ws)
+    col_order = _find_col_index(header_map, _ORDER_ALIASES_CANON["order_no"])
+    col_status = _find_col_index(header_map, _ORDER_ALIASES_CANON["status"])
+    col_extra = _find_col_index(header_map, _ORDER_ALIASES_CANON["extra"])
+    if col_order is None or col_status is None:
+        # a sheet layout problem: retrying would only repeat the same read
+        _log(
+            "update_order_status_noheaders",
+            order_col=col_order,
+            status_col=col_status,
+            dropped=list(pending),
+        )
+        return 0
+
+    rows: Dict[str, int] = {}
+    order_col_values: List[str] = _retrying(ws.col_values, col_order)
+    for i, v in enumerate(order_col_values[1:], start=2):
+        rows.setdefault((v or "").strip(), i)
+
+    data: List[Dict[str, Any]] = []
+    updated = 0
+    for order_no, (status, extra) in pending.items():
+        target_row = rows.get(order_no)
+        if not target_row:
+            _log("update_order_status_notfound", order_no=order_no)
+            continue
+        data.extend(_status_cells(target_row, col_status, col_extra, status, extra))
+        updated += 1
+    if data:
+        _retrying(ws.batch_update, data, value_input_option="USER_ENTERED")
+
+    _log("flush_order_updates", queued=len(pending), updated=updated)
+    return updated
+
+
+def _flush_in_background() -> None:
+    try:
+        flush_order_updates()
+    except Exception as e:  # noqa: BLE001
+        _log("flush_order_updates_failed", error=str(e))
+
+
+# don't drop queued updates when the process exits before the timer fires
+atexit.register(_flush_in_background)
@@ -0,0 +1,216 @@
+# src/gs_flush_check.py
+"""
+Offline check for gs_client's coalesced status updates (no Google access).
+Run with:  python -m src.gs_flush_check
+
+A fake orders worksheet is injected via gs_client._WS_CACHE and the flush
+delays are shortened, so every scenario finishes in well under a second.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+from gspread.exceptions import APIError
+
+from . import gs_client
+from .logger import flush as flush_logs
+
+problems: List[str] = []
+
+
+def _check(cond: bool, msg: str) -> None:
+    flush_logs()
+    print(f"[{'PASS' if cond else 'FAIL'}] {msg}")
+    if not cond:
+        problems.append(msg)
+
+
+def _api_error(code: int) -> APIError:
+    resp = requests.models.Response()
+    resp.status_code = code
+    resp._content = b'{"error": {"code": %d, "message": "fake"}}' % code
+    return APIError(resp)
+
+
+class _FakeOrders:
+    """Just enough of gspread.Worksheet for the status-update path."""
+
+    def __init__(self, headers: Optional[List[str]] = None) -> None:
+        self.headers = headers or ["Order No", "Status", "Notes"]
+        self.orders = ["O1", "O2"]
+        self.cells: Dict[str, str] = {}
+        self.writes: List[List[str]] = []  # statuses per batch_update, in order
+        self.calls = 0
+        # called with the 1-based batch_update number; may block or raise
+        self.before_write: Callable[[int], None] = lambda n: None
+
+    def row_values(self, row: int) -> List[str]:
+        return list(self.headers)
+
+    def col_values(self, col: int) -> List[str]:
+        return [self.headers[col - 1], *self.orders]
+
+    def batch_update(self, data, **kwargs) -> None:
+        self.calls += 1
+        self.before_write(self.calls)
+        for d in data:
+            self.cells[d["range"]] = d["values"][0][0]
+        self.writes.append([d["values"][0][0] for d in data])
+
+
+def _use(ws: _FakeOrders) -> None:
+    # drop whatever an earlier scenario left behind, then inject ws
+    timer = gs_client._FLUSH_TIMER
+    if timer is not None:
+        timer.cancel()
+    with gs_client._FLUSH_LOCK, gs_client._PENDING_LOCK:
+        gs_client._FLUSH_TIMER = None
+        gs_client._PENDING_UPDATES.clear()
+        gs_client._FLUSH_ATTEMPTS.clear()
+    gs_client._WS_CACHE["orders"] = ws
+
+
+def _settle(timeout: float = 2.0) -> None:
+    """Wait until nothing is queued and no flush is running."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with gs_client._FLUSH_LOCK, gs_client._PENDING_LOCK:
+            if not gs_client._PENDING_UPDATES:
+                return
+        time.sleep(0.01)
+
+
+def check_newer_status_wins() -> None:
+    ws = _FakeOrders()
+    in_flight = threading.Event()
+    release = threading.Event()
+
+    def slow_first(n: int) -> None:
+        if n == 1:
+            in_flight.set()
+            release.wait(2)
+
+    ws.before_write = slow_first
+    _use(ws)
+    gs_client.update_order_status_batched("O1", "PENDING_PAYMENT")
+    in_flight.wait(2)
+    # queued while the first batch_update is still running; its timer fires
+    # before that write returns
+    gs_client.update_order_status_batched("O1", "PAID")
+    time.sleep(gs_client._FLUSH_DELAY_SEC * 3)
+    release.set()
+    _settle()
+    _check(
+        ws.writes == [["PENDING_PAYMENT"], ["PAID"]] and ws.cells["B2"] == "PAID",
+        f"newer status lands last (writes={ws.writes})",
+    )
+
+
+def check_transient_failure_requeued() -> None:
+    ws = _FakeOrders()
+    tries = 5  # _retrying's attempts within one flush
+
+    def fail_one_flush(n: int) -> None:
+        if n == tries:
+            # queued while the flush is failing: the re-queued PAID must not
+            # overwrite it, but its extra is kept
+            gs_client.update_order_status_batched("O2", "SHIPPED")
+        if n <= tries:
+            raise _api_error(503)
+
+    ws.before_write = fail_one_flush
+    _use(ws)
+    gs_client.update_order_status_batched("O2", "PAID", extra="paid by card")
+    _settle()
+    _check(
+        ws.cells == {"B3": "SHIPPED", "C3": "paid by card"},
+        f"503 flush is re-queued, newer status wins (cells={ws.cells})",
+    )
+
+
+def check_transient_failure_capped() -> None:
+    ws = _FakeOrders()
+
+    def always_503(n: int) -> None:
+        raise _api_error(503)
+
+    ws.before_write = always_503
+    _use(ws)
+    gs_client.update_order_status_batched("O1", "PAID")
+    _settle()
+    expected = 5 * gs_client._FLUSH_MAX_ATTEMPTS
+    _check(
+        ws.calls == expected and not gs_client._PENDING_UPDATES,
+        f"503 flush gives up after {gs_client._FLUSH_MAX_ATTEMPTS} attempts "
+        f"(calls={ws.calls})",
+    )
+
+
+def check_permanent_failure_dropped() -> None:
+    ws = _FakeOrders()
+
+    def always_400(n: int) -> None:
+        raise _api_error(400)
+
+    ws.before_write = always_400
+    _use(ws)
+    gs_client.update_order_status_batched("O1", "PAID")
+    _settle()
+    time.sleep(gs_client._FLUSH_RETRY_SEC * 3)  # would a retry still fire?
+    _check(
+        ws.calls == 1 and not gs_client._PENDING_UPDATES,
+        f"400 flush is dropped, not retried (calls={ws.calls})",
+    )
+
+
+def check_missing_headers_dropped() -> None:
+    ws = _FakeOrders(headers=["Order No", "Total"])
+    _use(ws)
+    gs_client.update_order_status_batched("O1", "PAID")
+    _settle()
+    time.sleep(gs_client._FLUSH_RETRY_SEC * 3)  # would a retry still fire?
+    _check(
+        ws.calls == 0 and not gs_client._PENDING_UPDATES,
+        "update is dropped when the status header is missing",
+    )
+
+
+def check_exit_flush() -> None:
+    ws = _FakeOrders()
+    _use(ws)
+    delay = gs_client._FLUSH_DELAY_SEC
+    gs_client._FLUSH_DELAY_SEC = 60  # the timer must not be what writes it
+    try:
+        gs_client.update_order_status_batched("O1", "CANCELLED")
+    finally:
+        gs_client._FLUSH_DELAY_SEC = delay
+    # the atexit hook
+    gs_client._flush_in_background()
+    _check(
+        ws.cells.get("B2") == "CANCELLED" and gs_client._FLUSH_TIMER is None,
+        "exit hook writes queued updates and cancels the timer",
+    )
+
+
+def main() -> None:
+    gs_client._FLUSH_DELAY_SEC = 0.05
+    gs_client._FLUSH_RETRY_SEC = 0.05
+    gs_client._backoff = lambda base, attempt: 0.0
+    check_newer_status_wins()
+    check_transient_failure_requeued()
+    check_transient_failure_capped()
+    check_permanent_failure_dropped()
+    check_missing_headers_dropped()
+    check_exit_flush()
+    gs_client._WS_CACHE.pop("orders", None)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,53 +8,33 @@ from __future__ import annotations
 
 import json
 import random
-import re
 import time
-from typing import Dict, List, Optional
+from dataclasses import asdict
+from typing import Dict, Optional
 
 from .gs_client import (
     _open_ws,  # Ø§Ø³ØªÙØ§Ø¯Ù‡ ØµØ±ÙØ§Ù‹ Ø¨Ø±Ø§ÛŒ Ø®ÙˆØ§Ù†Ø¯Ù† Ù‡Ø¯Ø±Ù‡Ø§ÛŒ ÙˆØ§Ù‚Ø¹ÛŒ Ø´ÛŒØª
 )
 from .gs_client import (
     append_order,
+    canon,
     read_config_bot,
     read_config_site,
     read_products,
     update_order_status,
 )
+from .logger import flush as flush_logs
 
 
-def _p(obj) -> None:
-    """Pretty print JSON with UTF-8."""
-    print(json.dumps(obj, ensure_ascii=False))
-
-
-def _canon(s: str) -> str:
-    """
-    Ù†Ø±Ù…Ø§Ù„â€ŒØ³Ø§Ø²ÛŒ Ø§Ø³Ù… Ø³ØªÙˆÙ†â€ŒÙ‡Ø§:
-    - Ø­Ø°Ù Ø²ÛŒØ±Ø®Ø· (_) Ùˆ Ù†ÛŒÙ…â€ŒÙØ§ØµÙ„Ù‡ (ZWJ)
-    - Ø­Ø°Ù Ù‡Ø± Ú†ÛŒØ²ÛŒ Ø¯Ø§Ø®Ù„ Ù¾Ø±Ø§Ù†ØªØ² Ù…Ø«Ù„ (NEW/...)
-    - Ú©ÙˆÚ†Ú©â€ŒØ³Ø§Ø²ÛŒ Ùˆ ØªÚ©â€ŒÙØ§ØµÙ„Ù‡â€ŒÚ©Ø±Ø¯Ù†
-    """
-    if s is None:
-        return ""
-    s = str(s)
-    s = s.replace("_", " ").replace("\u200c", "")
-    s = re.sub(r"\(.*?\)", "", s)  # remove any (...) like (NEW/...)
-    s = s.lower()
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+def _out(*args) -> None:
+    """Print after queued DAO logs, so both stay in call order."""
+    flush_logs()
+    print(*args)
 
 
-def _build_header_map(headers: List[str]) -> Dict[str, str]:
-    """
-    Ø§Ø² Ù„ÛŒØ³Øª Ù‡Ø¯Ø±Ù‡Ø§ÛŒ Ø±Ø¯ÛŒÙ Û± Ø´ÛŒØªØŒ ÛŒÚ© Ù…Ù¾ canonical->actual Ù…ÛŒâ€ŒØ³Ø§Ø²Ø¯.
-    Ø¨Ø±Ø§ÛŒ Ú©Ù„ÛŒØ¯Ù‡Ø§ÛŒ Ù…ÙˆØ±Ø¯Ù†ÛŒØ§Ø²ØŒ Ù…Ø¹Ø§Ø¯Ù„ ÙˆØ§Ù‚Ø¹ÛŒ Ø³ØªÙˆÙ† Ø±Ø§ Ù¾ÛŒØ¯Ø§ Ù…ÛŒâ€ŒÚ©Ù†ÛŒÙ….
-    """
-    canon_to_actual: Dict[str, str] = {}
-    for h in headers:
-        canon_to_actual[_canon(h)] = h
-    return canon_to_actual
+def _p(obj) -> None:
+    """Pretty print JSON with UTF-8."""
+    _out(json.dumps(obj, ensure_ascii=False))
 
 
 def _pick(header_map: Dict[str, str], *candidates: str) -> Optional[str]:
@@ -62,7 +42,7 @@ def _pick(header_map: Dict[str, str], *candidates: str) -> Optional[str]:
     Ø¨Ø§ ØªÙˆØ¬Ù‡ Ø¨Ù‡ Ù„ÛŒØ³Øª Ú©Ø§Ù†Ø¯ÛŒØ¯Ù‡Ø§ (canonical)ØŒ Ø§ÙˆÙ„ÛŒÙ† Ù…ÙˆØ±Ø¯ÛŒ Ú©Ù‡ Ø¯Ø± map Ù‡Ø³Øª Ø±Ø§ Ø¨Ø±Ù…ÛŒâ€ŒÚ¯Ø±Ø¯Ø§Ù†Ø¯.  # noqa: E501
     """
     for c in candidates:
-        key = _canon(c)
+        key = canon(c)
         if key in header_map:
             return header_map[key]
     return None
@@ -72,23 +52,23 @@ def main() -> None:
     # =========================
     # 1) Read configs
     # =========================
-    print("== READ CONFIGS ==")
+    _out("== READ CONFIGS ==")
     bot = read_config_bot()
     site = read_config_site()
-    print("config_bot keys:", list(bot.keys())[:1])
-    print("config_site keys:", list(site.keys())[:1])
+    _out("config_bot keys:", list(bot.keys())[:1])
+    _out("config_site keys:", list(site.keys())[:1])
 
     # =========================
     # 2) Read products (first 3)
     # =========================
-    print("\n== READ PRODUCTS (first 3) ==")
+    _out("\n== READ PRODUCTS (first 3) ==")
     products = read_products()
     for p in products[:3]:
-        _p(p)
+        _p(asdict(p))
 
     # Ø§Ú¯Ø± Ù…Ø­ØµÙˆÙ„ÛŒ Ù†Ø¨ÙˆØ¯ØŒ Ø§Ø¯Ø§Ù…Ù‡ Ù†Ø¯Ù‡ÛŒÙ…
     if not products:
-        print("no products found; aborting smoketest.")
+        _out("no products found; aborting smoketest.")
         return
 
     # =========================
@@ -96,7 +76,7 @@ def main() -> None:
     # =========================
     ws = _open_ws("orders")
     headers = ws.row_values(1)
-    header_map = _build_header_map(headers)
+    header_map: Dict[str, str] = {canon(h): h for h in headers}
 
     # Ù…Ø¹Ø§Ø¯Ù„â€ŒÙ‡Ø§ÛŒ Ú©ÙŽÙ†ÙÙ†ÛŒÚ©Ø§Ù„ Ú©Ù‡ Ù…ÛŒâ€ŒØ®ÙˆØ§Ù‡ÛŒÙ… Ù¾ÙØ± Ú©Ù†ÛŒÙ…:
     col_order_no = _pick(
@@ -147,19 +127,19 @@ def main() -> None:
 
     # Ø­Ø¯Ø§Ù‚Ù„ Ù„Ø§Ø²Ù… Ø¯Ø§Ø±ÛŒÙ…: Ø´Ù…Ø§Ø±Ù‡ Ø³ÙØ§Ø±Ø´ + ÙˆØ¶Ø¹ÛŒØª (Ø¨Ø±Ø§ÛŒ Ø¢Ù¾Ø¯ÛŒØª Ø¨Ø¹Ø¯ÛŒ)
     if not col_order_no or not col_status:
-        print(
+        _out(
             "orders sheet headers are missing required columns (order_no/status). aborting."
         )
         return
 
-    print("\n== APPEND TEST ORDER ==")
+    _out("\n== APPEND TEST ORDER ==")
     now = int(time.time())
     order_no = f"T{now}"
 
     # Ø¢Ù…Ø§Ø¯Ù‡â€ŒØ³Ø§Ø²ÛŒ Ø§Ù‚Ù„Ø§Ù… ØªØ³Øª Ø§Ø² Ø¯Ùˆ Ù…Ø­ØµÙˆÙ„ Ø§ÙˆÙ„
     items_payload = [
         {
-            "code": (p.get("code") or p.get("Ú©Ø¯") or p.get("Ù†Ø§Ù…") or "P-TEST"),
+            "code": (p.code or p.name or "P-TEST"),
             "qty": random.randint(1, 3),
         }
         for p in products[:2]
@@ -199,14 +179,14 @@ def main() -> None:
         row[col_note] = "Ø³ÙØ§Ø±Ø´ ØªØ³Øª Ø§Ø³Ù…ÙˆÚ©"
 
     appended_row = append_order(row)
-    print(f"appended at row: {appended_row}")
+    _out(f"appended at row: {appended_row}")
 
     # =========================
     # 4) Update the same order status
     # =========================
-    print("\n== UPDATE ORDER STATUS ==")
+    _out("\n== UPDATE ORDER STATUS ==")
     ok = update_order_status(order_no, "PAID", "Ø±Ø³ÛŒØ¯ ØªØ§ÛŒÛŒØ¯ Ø´Ø¯")
-    print("update status ok?", ok)
+    _out("update status ok?", ok)
 
 
 if __name__ == "__main__":
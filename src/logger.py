@@ -1,20 +1,81 @@
 # src/logger.py
+import atexit
 import json
+import logging
+import logging.handlers
+import queue
 import sys
-import time
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+
+def _dumps(obj) -> str:
+    if orjson is not None:
+        raw = orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return raw.decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+class _JsonFormatter(logging.Formatter):
+    """
+    رکورد را روی ترد listener به یک خط JSON تبدیل می‌کند (ts از زمان ثبت رکورد).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        rec = getattr(record, "rec", None) or {"event": record.getMessage()}
+        return _dumps({"ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"), **rec})
+
+
+# صف + listener: فراخواننده فقط رکورد را در صف می‌گذارد؛ سریال‌سازی و نوشتن
+# روی stdout در ترد جداگانه انجام می‌شود.
+_LOGGER = logging.getLogger("abzarbot")
+if _LOGGER.handlers:
+    # ماژول با نام دیگری (logger / src.logger) قبلاً راه‌اندازی شده است
+    _LOG_Q = _LOGGER.handlers[0].queue
+else:
+    _LOG_Q = queue.Queue()
+    _STDOUT = logging.StreamHandler(sys.stdout)
+    _STDOUT.setFormatter(_JsonFormatter())
+    _LISTENER = logging.handlers.QueueListener(_LOG_Q, _STDOUT)
+    _LISTENER.start()
+    atexit.register(_LISTENER.stop)
+    _LOGGER.addHandler(logging.handlers.QueueHandler(_LOG_Q))
+    _LOGGER.setLevel(logging.DEBUG)
+    _LOGGER.propagate = False
+
+
+def emit(rec: dict) -> None:
+    """
+    رکورد آماده (بدون ts) را برای لاگ در صف می‌گذارد.
+    """
+    level = logging.getLevelName(str(rec.get("level") or "INFO").upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+    # کپی سطحی: سریال‌سازی بعداً روی ترد دیگر انجام می‌شود
+    _LOGGER.log(level, rec.get("event", ""), extra={"rec": dict(rec)})
+
+
+def flush() -> None:
+    """
+    تا نوشته‌شدن همه‌ی لاگ‌های صف‌شده روی stdout صبر می‌کند.
+    """
+    _LOG_Q.join()
+    sys.stdout.flush()
 
 
 def log(level: str, event: str, meta=None, user=None, module=None):
     """
     لاگ ساخت‌یافته‌ی ساده به‌صورت JSON روی stdout.
     """
-    rec = {
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
-        "level": (level or "INFO").upper(),
-        "event": event,
-        "user": user,
-        "module": module or __name__,
-        "meta": meta or {},
-    }
-    sys.stdout.write(json.dumps(rec, ensure_ascii=False) + "\n")
-    sys.stdout.flush()
+    emit(
+        {
+            "level": (level or "INFO").upper(),
+            "event": event,
+            "user": user,
+            "module": module or __name__,
+            "meta": dict(meta) if isinstance(meta, dict) else (meta or {}),
+        }
+    )
@@ -1,13 +1,15 @@
+import re
+import unicodedata
+
+# ی/ك → ی/ک ؛ نیم‌فاصله و علائم رایج → فاصله
+_FA_TRANS = str.maketrans({"ي": "ی", "ك": "ک", "\u200c": " ", ",": " ", "،": " "})
+# فاصله‌های اضافه
+_FA_SPACES = re.compile(r" {2,}")
+
+
 def normalize_fa(s: str) -> str:
     if not s:
         return ""
-    s = s.strip()
-    # ی/ك → ی/ک
-    s = s.replace("ي", "ی").replace("ك", "ک")
-    # نیم‌فاصله و علائم رایج
-    for ch in ["‌", "\u200c", ",", "،"]:
-        s = s.replace(ch, " ")
-    # فاصله‌های اضافه
-    while "  " in s:
-        s = s.replace("  ", " ")
-    return s.lower()
+    if not unicodedata.is_normalized("NFC", s):
+        s = unicodedata.normalize("NFC", s)
+    return _FA_SPACES.sub(" ", s.strip().translate(_FA_TRANS)).lower()
@@ -2,6 +2,7 @@ import datetime as dt
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import gspread
 from dotenv import load_dotenv
@@ -25,17 +26,9 @@ def fail(msg: str, tag: str | None = None):
 cred_path = os.getenv("GOOGLE_SHEETS_CREDENTIALS", "./credentials.json")
 sheet_id = (os.getenv("GOOGLE_SHEET_ID") or "").strip()
 
-# 1.a) اعتبارسنجی فایل credentials.json
-client_email = ""
+# 1.a) وجود فایل credentials.json
 if os.path.exists(cred_path):
     ok(f"credentials.json found at {cred_path}")
-    try:
-        with open(cred_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        client_email = data.get("client_email", "")
-        print(f"[INFO] service account: {client_email}")
-    except Exception as e:
-        fail(f"cannot read credentials.json: {e}", "read_credentials")
 else:
     fail(f"credentials.json missing at {cred_path}", "cred_missing")
 
@@ -50,13 +43,48 @@ if problems:
     print("\nSummary: FAIL (pre-checks)")
     sys.exit(2)
 
-# 2) اتصال به Google Sheets
-try:
+
+def read_client_email() -> str:
+    with open(cred_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("client_email", "")
+
+
+def open_spreadsheet():
     gc = gspread.service_account(filename=cred_path)
     sh = gc.open_by_key(sheet_id)
-    ok(f"opened spreadsheet: {sh.title}")
+    return sh, sh.worksheets()
+
 
-    titles = [ws.title for ws in sh.worksheets()]
+# 2) خواندن credentials و اتصال به Google Sheets به‌صورت هم‌زمان
+#    (مستقل از هم‌اند؛ فقط درج ردیف آزمون باید بعد از لیست تب‌ها بیاید)
+client_email = ""
+sh = None
+worksheets = []
+with ThreadPoolExecutor(max_workers=2) as executor:
+    futures = {
+        executor.submit(read_client_email): "read_credentials",
+        executor.submit(open_spreadsheet): "open_sheet",
+    }
+    for fut in as_completed(futures):
+        tag = futures[fut]
+        try:
+            result = fut.result()
+        except Exception as e:
+            if tag == "read_credentials":
+                fail(f"cannot read credentials.json: {e}", tag)
+            else:
+                fail(f"cannot open spreadsheet or auth failed: {e}", tag)
+            continue
+        if tag == "read_credentials":
+            client_email = result
+            print(f"[INFO] service account: {client_email}")
+        else:
+            sh, worksheets = result
+            ok(f"opened spreadsheet: {sh.title}")
+
+if sh is not None:
+    titles = [ws.title for ws in worksheets]
     print("[INFO] tabs:", ", ".join(titles))
 
     required = [
@@ -76,8 +104,11 @@ try:
         ok("all required tabs exist")
 
     # 3) درج یک ردیف آزمون در logs
+    #    (از همان لیست worksheets؛ بدون درخواست دوباره‌ی metadata)
     try:
-        ws = sh.worksheet("logs")
+        ws = next((w for w in worksheets if w.title == "logs"), None)
+        if ws is None:
+            raise gspread.exceptions.WorksheetNotFound("logs")
         now = dt.datetime.now().isoformat(timespec="seconds")
         row = [
             now,
@@ -92,9 +123,6 @@ try:
     except Exception as e:
         fail(f"cannot append to 'logs': {e}", "append_logs")
 
-except Exception as e:
-    fail(f"cannot open spreadsheet or auth failed: {e}", "open_sheet")
-
 # 4) نتیجه نهایی + کد خروج
 if problems:
     print("\nSummary: FAIL")